@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
+import os
 import plotly.graph_objects as go
+from numba import njit
 from datetime import datetime, timedelta
 
 # --- Page Configuration (Theme is now in config.toml) ---
@@ -13,34 +14,131 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# --- Feature Columns ---
+# This order must exactly match the training order of your model
+EXPECTED_COLUMNS = ("pressure", "dewpoint", "humidity", "cloud", "sunshine", "winddirection", "windspeed")
+CATEGORIES = tuple(c.replace('_', ' ').title() for c in EXPECTED_COLUMNS)
+
+# --- Model Loading (cached across reruns and sessions) ---
+FOREST_PATH = 'rainfall_prediction_model.npz'
+MODEL_PATH = 'rainfall_prediction_model.joblib'
+
+@njit(cache=True)
+def rf_predict(x, thr, feat, cl, cr, vote):
+    # Sum the leaf class probabilities of every tree for a single row
+    proba = np.zeros(vote.shape[2])
+    for t in range(feat.shape[0]):
+        node = 0
+        while cl[t, node] != -1:
+            if x[feat[t, node]] <= thr[t, node]:
+                node = cl[t, node]
+            else:
+                node = cr[t, node]
+        proba += vote[t, node]
+    return proba
+
+class FlatForest:
+    """Random Forest evaluated from the flat tree arrays written by save_model.py."""
+
+    def __init__(self, arrays):
+        self.feature = np.ascontiguousarray(arrays['feature'])
+        self.threshold = np.ascontiguousarray(arrays['threshold'])
+        self.children_left = np.ascontiguousarray(arrays['children_left'])
+        self.children_right = np.ascontiguousarray(arrays['children_right'])
+        self.value = np.ascontiguousarray(arrays['value'])
+        self.classes = arrays['classes']
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        labels = np.empty(X.shape[0], dtype=self.classes.dtype)
+        for i in range(X.shape[0]):
+            proba = rf_predict(X[i], self.threshold, self.feature,
+                               self.children_left, self.children_right, self.value)
+            labels[i] = self.classes[proba.argmax()]
+        return labels
+
+@st.cache_resource
+def load_model():
+    if os.path.exists(FOREST_PATH):
+        with np.load(FOREST_PATH, allow_pickle=False) as arrays:
+            return FlatForest(arrays)
+    # Fall back to flattening the pickled estimator if the .npz is missing
+    import joblib
+    from save_model import export_forest
+    loaded_object = joblib.load(MODEL_PATH)
+    model = loaded_object.get('model') if isinstance(loaded_object, dict) else loaded_object
+    return None if model is None else FlatForest(export_forest(model))
+
+@st.cache_data(max_entries=256)
+def predict_rain(input_values):
+    # input_values is a tuple ordered like EXPECTED_COLUMNS
+    model = load_model()
+    row = np.array([input_values], dtype=np.float32)
+    return int(model.predict(row)[0])
+
+# --- Radar Chart ---
+def build_radar(values_tuple, categories_tuple):
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+          r=list(values_tuple),
+          theta=list(categories_tuple),
+          fill='toself',
+          name='Input Values'
+    ))
+    fig.update_layout(
+      polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+      showlegend=False,
+      paper_bgcolor='rgba(0,0,0,0)',
+      plot_bgcolor='rgba(0,0,0,0)',
+      font_color='white',
+      margin=dict(l=40, r=40, t=40, b=40)
+    )
+    return fig
+
 # --- Initialize Session State for Sliders ---
-if 'pressure' not in st.session_state:
-    st.session_state.pressure = 1015.0
-    st.session_state.dewpoint = 12.0
-    st.session_state.humidity = 65
-    st.session_state.cloud = 4
-    st.session_state.sunshine = 7.6
-    st.session_state.winddirection = 180
-    st.session_state.windspeed = 20
+DEFAULTS = {"pressure": 1015.0, "dewpoint": 12.0, "humidity": 65, "cloud": 4,
+            "sunshine": 7.6, "winddirection": 180, "windspeed": 20}
+for k, v in DEFAULTS.items():
+    st.session_state.setdefault(k, v)
 
 # --- Preset Data Functions ---
+RAINY_PRESET = {"pressure": 995.0, "dewpoint": 20.0, "humidity": 95, "cloud": 8,
+                "sunshine": 0.5, "winddirection": 210, "windspeed": 55}
+DRY_PRESET = {"pressure": 1025.0, "dewpoint": 5.0, "humidity": 40, "cloud": 1,
+              "sunshine": 12.0, "winddirection": 150, "windspeed": 10}
+
+def mark_interacted():
+    st.session_state._interacted = True
+
+def request_prediction():
+    mark_interacted()
+    st.session_state._predict = True
+
 def load_rainy_day():
-    st.session_state.pressure = 995.0
-    st.session_state.dewpoint = 20.0
-    st.session_state.humidity = 95
-    st.session_state.cloud = 8
-    st.session_state.sunshine = 0.5
-    st.session_state.winddirection = 210
-    st.session_state.windspeed = 55
+    st.session_state.update(RAINY_PRESET)
+    mark_interacted()
 
 def load_dry_day():
-    st.session_state.pressure = 1025.0
-    st.session_state.dewpoint = 5.0
-    st.session_state.humidity = 40
-    st.session_state.cloud = 1
-    st.session_state.sunshine = 12.0
-    st.session_state.winddirection = 150
-    st.session_state.windspeed = 10
+    st.session_state.update(DRY_PRESET)
+    mark_interacted()
+
+# --- Static Content ---
+FEATURE_EXPLANATION_MD = """#### Understanding the Weather Metrics
+- **Pressure (hPa):** Hectopascals, a unit for measuring atmospheric pressure. High pressure is often associated with clear skies, while low pressure can indicate stormy weather.
+- **Dew Point (°C):** The temperature to which air must be cooled to become saturated with water vapor. A higher dew point means more moisture in the air.
+- **Cloud Cover (oktas):** A scale from 0 to 8 measuring what fraction of the sky is covered in clouds. 0 is a clear sky, 8 is completely overcast.
+
+---
+
+#### When is Rain Likely?
+Rain isn't caused by a single factor, but rather a combination of conditions. The likelihood of rain increases significantly when you observe the following:
+
+- **Low Atmospheric Pressure:** When pressure is low (e.g., below 1000 hPa), air rises, cools, and moisture condenses to form rain.
+- **High Humidity & Dew Point:** High humidity (> 85%) means the air is saturated. When the dew point is close to the air temperature, rain is more probable.
+- **High Cloud Cover & Low Sunshine:** A mostly overcast sky (7-8 oktas) with little sunshine indicates conditions are ripe for precipitation.
+
+Try using the **'Load Rainy Day'** preset to see a typical combination of these factors.
+"""
 
 # --- Sidebar for User Input ---
 with st.sidebar:
@@ -55,23 +153,27 @@ with st.sidebar:
 
     st.markdown("---")
     
-    st.subheader("Atmospheric Features")
-    pressure = st.slider('Pressure (hPa)', 950.0, 1050.0, key='pressure', step=0.1, help="Atmospheric pressure at sea level")
-    dewpoint = st.slider('Dew Point (°C)', -20.0, 40.0, key='dewpoint', step=0.1)
-    humidity = st.slider('Humidity (%)', 0, 100, key='humidity')
-    
-    st.subheader("Sky & Sun")
-    cloud = st.slider('Cloud Cover (oktas)', 0, 8, key='cloud', help="Cloudiness measured in eighths of the sky")
-    sunshine = st.slider('Sunshine (hours)', 0.0, 15.0, key='sunshine', step=0.1)
-    
-    st.subheader("Wind Features")
-    winddirection = st.slider('Wind Direction (degrees)', 0, 360, key='winddirection')
-    windspeed = st.slider('Wind Speed (km/h)', 0, 150, key='windspeed')
-    
+    with st.form("inputs", clear_on_submit=False):
+        st.subheader("Atmospheric Features")
+        pressure = st.slider('Pressure (hPa)', 950.0, 1050.0, key='pressure', step=0.1, help="Atmospheric pressure at sea level")
+        dewpoint = st.slider('Dew Point (°C)', -20.0, 40.0, key='dewpoint', step=0.1)
+        humidity = st.slider('Humidity (%)', 0, 100, key='humidity')
+
+        st.subheader("Sky & Sun")
+        cloud = st.slider('Cloud Cover (oktas)', 0, 8, key='cloud', help="Cloudiness measured in eighths of the sky")
+        sunshine = st.slider('Sunshine (hours)', 0.0, 15.0, key='sunshine', step=0.1)
+
+        st.subheader("Wind Features")
+        winddirection = st.slider('Wind Direction (degrees)', 0, 360, key='winddirection')
+        windspeed = st.slider('Wind Speed (km/h)', 0, 150, key='windspeed')
+
+        st.form_submit_button("Apply", on_click=mark_interacted, use_container_width=True)
+        st.form_submit_button("Apply & Predict", on_click=request_prediction, type="primary", use_container_width=True)
+
     st.markdown("---")
     st.header("About This App")
     st.info(
-        "This application uses a Random Forest model to predict if it will rain tomorrow based on today's weather. Adjust the sliders to see the forecast change!"
+        "This application uses a Random Forest model to predict if it will rain tomorrow based on today's weather. Adjust the sliders and click Apply & Predict to see the forecast change!"
     )
 
 # --- Main Page ---
@@ -79,13 +181,8 @@ st.title("🌌 Rainfall Prediction Pro")
 st.markdown("### An interactive app to forecast tomorrow's weather.")
 st.markdown("---")
 
-# This order must exactly match the training order of your model
-data = {
-    'pressure': st.session_state.pressure, 'dewpoint': st.session_state.dewpoint, 'humidity': st.session_state.humidity, 'cloud': st.session_state.cloud, 
-    'sunshine': st.session_state.sunshine, 'winddirection': st.session_state.winddirection, 'windspeed': st.session_state.windspeed
-}
-expected_columns = list(data.keys())
-input_df = pd.DataFrame(data, index=[0])[expected_columns]
+# Display uses the raw slider values; only the model input is cast to float32
+input_values = tuple(st.session_state[k] for k in EXPECTED_COLUMNS)
 
 # --- Main Layout ---
 col1, col2 = st.columns([2, 1.5])
@@ -93,19 +190,15 @@ col1, col2 = st.columns([2, 1.5])
 with col1:
     st.subheader("Prediction Outcome")
     
-    # Prediction button and logic
-    if st.button('Predict Rainfall for Tomorrow', use_container_width=True):
+    # Predict only from submitted form values, never from unapplied slider edits
+    if st.session_state.pop("_predict", False):
         try:
-            with open('rainfall_prediction_model.pkl', 'rb') as file:
-                loaded_object = pickle.load(file)
-            model = loaded_object.get('model') if isinstance(loaded_object, dict) else loaded_object
-
-            if model is None:
-                 st.error("Could not load the model from the .pkl file.")
+            if load_model() is None:
+                 st.error("Could not load the model from the model files.")
             else:
-                prediction = model.predict(input_df)
+                prediction = predict_rain(input_values)
                 with st.container(border=True):
-                    if prediction[0] == 1:
+                    if prediction == 1:
                         st.markdown('<h1 style="text-align: center;">☔<br>It will likely rain!</h1>', unsafe_allow_html=True)
                         st.info("💡 Suggestion: Don't forget to carry an umbrella!")
                     else:
@@ -113,11 +206,11 @@ with col1:
                         st.info("💡 Suggestion: A great day for outdoor activities!")
 
         except FileNotFoundError:
-            st.error("Model file not found. Ensure 'rainfall_prediction_model.pkl' is present.")
+            st.error(f"Model file not found. Ensure '{FOREST_PATH}' or '{MODEL_PATH}' is present.")
         except Exception as e:
             st.error(f"An error occurred: {e}")
     else:
-        st.info("Adjust the sliders in the sidebar and click the button to see the prediction.")
+        st.info("Adjust the sliders in the sidebar and click Apply & Predict to see the prediction.")
 
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -126,66 +219,47 @@ with col1:
     tab1, tab2 = st.tabs(["Feature Explanations", "Illustrative 5-Day Forecast"])
 
     with tab1:
-        st.markdown("#### Understanding the Weather Metrics")
-        st.markdown("- **Pressure (hPa):** Hectopascals, a unit for measuring atmospheric pressure. High pressure is often associated with clear skies, while low pressure can indicate stormy weather.")
-        st.markdown("- **Dew Point (°C):** The temperature to which air must be cooled to become saturated with water vapor. A higher dew point means more moisture in the air.")
-        st.markdown("- **Cloud Cover (oktas):** A scale from 0 to 8 measuring what fraction of the sky is covered in clouds. 0 is a clear sky, 8 is completely overcast.")
-        st.markdown("---")
-        st.markdown("#### When is Rain Likely?")
-        st.markdown(
-            "Rain isn't caused by a single factor, but rather a combination of conditions. "
-            "The likelihood of rain increases significantly when you observe the following:"
-        )
-        st.markdown("- **Low Atmospheric Pressure:** When pressure is low (e.g., below 1000 hPa), air rises, cools, and moisture condenses to form rain.")
-        st.markdown("- **High Humidity & Dew Point:** High humidity (> 85%) means the air is saturated. When the dew point is close to the air temperature, rain is more probable.")
-        st.markdown("- **High Cloud Cover & Low Sunshine:** A mostly overcast sky (7-8 oktas) with little sunshine indicates conditions are ripe for precipitation.")
-        st.markdown("Try using the **'Load Rainy Day'** preset to see a typical combination of these factors.")
+        st.markdown(FEATURE_EXPLANATION_MD)
 
     with tab2:
         st.markdown("#### Example 5-Day Outlook")
         st.caption("This is an illustrative forecast and is not based on a predictive model.")
         forecast_cols = st.columns(5)
         today = datetime.now()
+        rng = np.random.default_rng()
+        is_sunny = rng.random(5) > 0.5
+        base = int(st.session_state.dewpoint)
+        lows = np.where(is_sunny, base + 5, base)
+        highs = np.where(is_sunny, base + 15, base + 10)
+        temps = rng.integers(lows, highs)
         for i in range(5):
             day = today + timedelta(days=i + 1)
             with forecast_cols[i]:
                 with st.container(border=True):
                     st.markdown(f"<div style='text-align: center;'><b>{day.strftime('%a')}</b></div>", unsafe_allow_html=True)
-                    if np.random.rand() > 0.5:
+                    if is_sunny[i]:
                         st.markdown("<div style='font-size: 2.5em; text-align: center;'>☀️</div>", unsafe_allow_html=True)
-                        temp = f"{np.random.randint(int(st.session_state.dewpoint)+5, int(st.session_state.dewpoint)+15)}°C"
                     else:
                         st.markdown("<div style='font-size: 2.5em; text-align: center;'>🌧️</div>", unsafe_allow_html=True)
-                        temp = f"{np.random.randint(int(st.session_state.dewpoint), int(st.session_state.dewpoint)+10)}°C"
+                    temp = f"{temps[i]}°C"
                     st.markdown(f"<div style='text-align: center;'>{temp}</div>", unsafe_allow_html=True)
         
 with col2:
     with st.container(border=True):
         st.subheader("Current Weather Inputs")
         
-        # Data Table
-        st.markdown("##### Input Values")
-        st.dataframe(input_df.T.rename(columns={0: 'Values'}), use_container_width=True)
-        
-        # Radar Chart
-        st.markdown("##### Weather Factors Visualization")
-        categories = [col.replace('_', ' ').title() for col in expected_columns]
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-              r=input_df.iloc[0].values,
-              theta=categories,
-              fill='toself',
-              name='Input Values'
-        ))
-        fig.update_layout(
-          polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-          showlegend=False,
-          paper_bgcolor='rgba(0,0,0,0)',
-          plot_bgcolor='rgba(0,0,0,0)',
-          font_color='white',
-          margin=dict(l=40, r=40, t=40, b=40)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # Skip building the table and chart until the user has applied inputs
+        if st.session_state.get("_interacted", False):
+            # Data Table
+            st.markdown("##### Input Values")
+            st.dataframe(pd.DataFrame({'Values': input_values}, index=list(EXPECTED_COLUMNS)), use_container_width=True)
+
+            # Radar Chart
+            st.markdown("##### Weather Factors Visualization")
+            fig = build_radar(input_values, CATEGORIES)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.caption("Load a preset or click Apply in the sidebar to visualize your inputs.")
 
 
 # --- Footer ---
@@ -0,0 +1,55 @@
+import pickle
+import joblib
+import numpy as np
+
+SOURCE_PATH = 'rainfall_prediction_model.pkl'
+MODEL_PATH = 'rainfall_prediction_model.joblib'
+FOREST_PATH = 'rainfall_prediction_model.npz'
+
+def export_forest(model):
+    """Flatten every tree of a fitted forest into arrays padded to the largest tree."""
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    n_trees = len(trees)
+    max_nodes = max(tree.node_count for tree in trees)
+    n_classes = len(model.classes_)
+
+    feature = np.full((n_trees, max_nodes), -2, dtype=np.int64)
+    threshold = np.full((n_trees, max_nodes), -2.0, dtype=np.float64)
+    children_left = np.full((n_trees, max_nodes), -1, dtype=np.int64)
+    children_right = np.full((n_trees, max_nodes), -1, dtype=np.int64)
+    value = np.zeros((n_trees, max_nodes, n_classes), dtype=np.float64)
+
+    for i, tree in enumerate(trees):
+        n = tree.node_count
+        feature[i, :n] = tree.feature
+        threshold[i, :n] = tree.threshold
+        children_left[i, :n] = tree.children_left
+        children_right[i, :n] = tree.children_right
+        # Normalise leaf values to class probabilities, as predict_proba does
+        leaf_value = tree.value[:, 0, :]
+        value[i, :n] = leaf_value / leaf_value.sum(axis=1, keepdims=True)
+
+    return {
+        'feature': feature,
+        'threshold': threshold,
+        'children_left': children_left,
+        'children_right': children_right,
+        'value': value,
+        'classes': model.classes_,
+    }
+
+if __name__ == '__main__':
+    # One-off: re-save the trained model next to the original .pkl with pickle
+    # protocol 5, which stores the tree arrays as raw buffers. The app only
+    # reads this file as a fallback when the .npz below is missing.
+    with open(SOURCE_PATH, 'rb') as file:
+        loaded_object = pickle.load(file)
+    model = loaded_object.get('model') if isinstance(loaded_object, dict) else loaded_object
+
+    joblib.dump(model, MODEL_PATH, protocol=5)
+    print(f"Saved model to {MODEL_PATH} with pickle protocol 5")
+
+    # Export the flat tree arrays so the app can predict from a plain .npz
+    # without unpickling any Python objects.
+    np.savez(FOREST_PATH, **export_forest(model))
+    print(f"Saved flat forest arrays to {FOREST_PATH}")